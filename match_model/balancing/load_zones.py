@@ -8,14 +8,139 @@
 """
 Defines load zone parameters for the Match model.
 """
+import csv
 import os
+import numpy as np
+import pandas as pd
 from pyomo.environ import *
-from match_model.reporting import write_table
+from match_model.reporting import format_row, save_dataframe
 
 dependencies = "match_model.timescales"
 optional_dependencies = "match_model.transmission.local_td"
 
 
+def _init_zone_timepoints(m):
+    return m.LOAD_ZONES * m.TIMEPOINTS
+
+
+def _init_zone_total_demand_in_period_mwh(m):
+    # Fill the whole Param with one store_values() call instead of
+    # dispatching an initializer rule once per (zone, period) index.
+    m.zone_total_demand_in_period_mwh.store_values(
+        _total_demand_by_zone_and_period(m)
+    )
+
+
+def _resolve_zone_balance_components(m):
+    # Resolve the dynamic component lists into component objects once, on
+    # the first call, instead of repeating C getattr() lookups for every
+    # (zone, timepoint) pair. Components registered with a zone subset
+    # are dropped from the per-zone participant tuples for all other
+    # zones, so the balance sums scale with the nonzero participants
+    # rather than the full component list.
+    cache = getattr(m, "_zone_balance_components", None)
+    if cache is None:
+        zone_subsets = getattr(m, "zone_balance_component_zones", {})
+        injections = [
+            (getattr(m, component), zone_subsets.get(component))
+            for component in m.Zone_Power_Injections
+        ]
+        withdrawals = [
+            (getattr(m, component), zone_subsets.get(component))
+            for component in m.Zone_Power_Withdrawals
+        ]
+        cache = (
+            [component for (component, zones) in injections],
+            [component for (component, zones) in withdrawals],
+            {
+                z: (
+                    tuple(c for (c, zones) in injections if zones is None or z in zones),
+                    tuple(
+                        c for (c, zones) in withdrawals if zones is None or z in zones
+                    ),
+                )
+                for z in m.LOAD_ZONES
+            },
+        )
+        m._zone_balance_components = cache
+    return cache
+
+
+def _init_zone_energy_balance(m, z, t):
+    injections, withdrawals = _resolve_zone_balance_components(m)[2][z]
+    # quicksum builds the summation expressions in place rather than
+    # creating a tree of intermediate sum nodes.
+    return quicksum(component[z, t] for component in injections) == quicksum(
+        component[z, t] for component in withdrawals
+    )
+
+
+def _total_demand_by_zone_and_period(m):
+    """
+    Compute sum(zone_demand_mw[z,t] * tp_weight[t] for t in TPS_IN_PERIOD[p])
+    for every (z,p) pair in one vectorized pass and return the results as a
+    dict keyed by (zone, period). Extracting the demand data into a numpy
+    array once and reducing it with matrix-vector products avoids making
+    O(zones x timepoints) individual Param lookups per period, which
+    dominates construction time on models with many timepoints.
+    """
+    zones = list(m.LOAD_ZONES)
+    timepoints = list(m.TIMEPOINTS)
+    demand = np.fromiter(
+        (value(m.zone_demand_mw[z, t]) for z in zones for t in timepoints),
+        dtype=np.float64,
+        count=len(zones) * len(timepoints),
+    ).reshape(len(zones), len(timepoints))
+    tp_weight = np.fromiter(
+        (value(m.tp_weight[t]) for t in timepoints),
+        dtype=np.float64,
+        count=len(timepoints),
+    )
+    tp_index = {t: i for i, t in enumerate(timepoints)}
+    totals = {}
+    for p in m.PERIODS:
+        idx = np.fromiter((tp_index[t] for t in m.TPS_IN_PERIOD[p]), dtype=np.intp)
+        weighted_demand = demand[:, idx] @ tp_weight[idx]
+        for zi, z in enumerate(zones):
+            totals[z, p] = float(weighted_demand[zi])
+    return totals
+
+
+def define_arguments(argparser):
+    argparser.add_argument(
+        "--load-timeseries-with-pandas",
+        default=False,
+        action="store_true",
+        dest="load_timeseries_with_pandas",
+        help="Parse loads.csv with the pandas C engine and bulk-initialize "
+        "zone_demand_mw, instead of going through the DataPortal reader. "
+        "Considerably faster for large LOAD_ZONE x TIMEPOINT grids.",
+    )
+    argparser.add_argument(
+        "--compile-linear-constraints",
+        default=False,
+        action="store_true",
+        dest="compile_linear_constraints",
+        help="Before solving, compile all active linear constraints "
+        "(dominated by Zone_Energy_Balance) into a flat matrix "
+        "representation. This replaces the per-index constraint objects, "
+        "which substantially reduces memory use and LP/NL write time on "
+        "large models, but the original constraints (and their duals) are "
+        "no longer available individually after the solve.",
+    )
+    argparser.add_argument(
+        "--matrix-balance",
+        default=False,
+        action="store_true",
+        dest="matrix_balance",
+        help="Before solving, compile only the Zone_Energy_Balance "
+        "constraints into a flat matrix representation, leaving every "
+        "other constraint (and its duals) untouched. Subsumed by "
+        "--compile-linear-constraints, which compiles all linear "
+        "constraints.",
+    )
+
+
 def define_dynamic_lists(mod):
     """
     Zone_Power_Injections and Zone_Power_Withdrawals are lists of
@@ -25,9 +150,40 @@ def define_dynamic_lists(mod):
     Other modules may append to either list, as long as the components they
     add are indexed by [zone, timepoint] and have units of MW. Other modules
     often include Expressions to summarize decision variables on a zonal basis.
+
+    Modules whose components are only nonzero in a subset of load zones
+    can register them with register_injection() / register_withdrawal()
+    and pass that subset, so the balance equations for the other zones
+    skip them instead of summing structural zeros. Appending directly to
+    the lists remains supported and is equivalent to registering a
+    component for all zones; zone_balance_component_zones records the
+    declared subsets.
     """
     mod.Zone_Power_Injections = []
     mod.Zone_Power_Withdrawals = []
+    mod.zone_balance_component_zones = {}
+
+
+def register_injection(mod, component_name, zones=None):
+    """
+    Register a component as a power injection in the zonal balance. If
+    zones is given, the component is treated as structurally zero in all
+    other load zones and is skipped in their balance equations.
+    """
+    mod.Zone_Power_Injections.append(component_name)
+    if zones is not None:
+        mod.zone_balance_component_zones[component_name] = frozenset(zones)
+
+
+def register_withdrawal(mod, component_name, zones=None):
+    """
+    Register a component as a power withdrawal in the zonal balance. If
+    zones is given, the component is treated as structurally zero in all
+    other load zones and is skipped in their balance equations.
+    """
+    mod.Zone_Power_Withdrawals.append(component_name)
+    if zones is not None:
+        mod.zone_balance_component_zones[component_name] = frozenset(zones)
 
 
 def define_components(mod):
@@ -65,23 +221,30 @@ def define_components(mod):
     mod.LOAD_ZONES = Set(dimen=1)
     mod.ZONE_TIMEPOINTS = Set(
         dimen=2,
-        initialize=lambda m: m.LOAD_ZONES * m.TIMEPOINTS,
+        initialize=_init_zone_timepoints,
         doc="The cross product of load zones and timepoints, used for indexing.",
     )
-    mod.zone_demand_mw = Param(mod.ZONE_TIMEPOINTS, within=NonNegativeReals)
+    # zone_demand_mw is mutable so scenario sweeps can update demand in
+    # place and re-solve (e.g. through a persistent solver interface)
+    # instead of rebuilding the whole model.
+    mod.zone_demand_mw = Param(
+        mod.ZONE_TIMEPOINTS, within=NonNegativeReals, mutable=True
+    )
     mod.min_data_check("LOAD_ZONES", "zone_demand_mw")
     try:
         mod.Distributed_Power_Withdrawals.append("zone_demand_mw")
     except AttributeError:
-        mod.Zone_Power_Withdrawals.append("zone_demand_mw")
+        register_withdrawal(mod, "zone_demand_mw")
 
     mod.zone_total_demand_in_period_mwh = Param(
         mod.LOAD_ZONES,
         mod.PERIODS,
         within=NonNegativeReals,
-        initialize=lambda m, z, p: (
-            sum(m.zone_demand_mw[z, t] * m.tp_weight[t] for t in m.TPS_IN_PERIOD[p])
-        ),
+        mutable=True,
+        default=0.0,
+    )
+    mod.Calculate_Zone_Total_Demand = BuildAction(
+        rule=_init_zone_total_demand_in_period_mwh
     )
 
 
@@ -102,12 +265,7 @@ def define_dynamic_components(mod):
 
     mod.Zone_Energy_Balance = Constraint(
         mod.ZONE_TIMEPOINTS,
-        rule=lambda m, z, t: (
-            sum(getattr(m, component)[z, t] for component in m.Zone_Power_Injections)
-            == sum(
-                getattr(m, component)[z, t] for component in m.Zone_Power_Withdrawals
-            )
-        ),
+        rule=_init_zone_energy_balance,
     )
 
 
@@ -136,11 +294,76 @@ def load_inputs(mod, match_data, inputs_dir):
     match_data.load_aug(
         filename=os.path.join(inputs_dir, "load_zones.csv"), set=mod.LOAD_ZONES
     )
-    match_data.load_aug(
-        filename=os.path.join(inputs_dir, "loads.csv"),
-        autoselect=True,
-        param=[mod.zone_demand_mw],
-    )
+    if mod.options.load_timeseries_with_pandas:
+        # Fast path: loads.csv is by far the largest input table, and the
+        # line-by-line DataPortal reader dominates model setup time on big
+        # LOAD_ZONE x TIMEPOINT grids. Read it with pandas' C parser and
+        # hand the parameter data to the DataPortal as a plain dict.
+        # .tolist() converts the column values back to native Python
+        # types so the dict keys match the set elements loaded above.
+        df = pd.read_csv(
+            os.path.join(inputs_dir, "loads.csv"),
+            usecols=["LOAD_ZONE", "TIMEPOINT", "zone_demand_mw"],
+        )
+        match_data.data()["zone_demand_mw"] = dict(
+            zip(
+                zip(df["LOAD_ZONE"].tolist(), df["TIMEPOINT"].tolist()),
+                df["zone_demand_mw"].tolist(),
+            )
+        )
+    else:
+        match_data.load_aug(
+            filename=os.path.join(inputs_dir, "loads.csv"),
+            autoselect=True,
+            param=[mod.zone_demand_mw],
+        )
+
+
+def pre_solve(instance):
+    """
+    Optionally compile the model's linear constraints into a single
+    MatrixConstraint before handing the instance to the solver. The
+    Zone_Energy_Balance block - a pure +/-1 linear equality per (zone,
+    timepoint) - is the dominant constraint block of this model, so
+    collapsing the per-index constraint objects into flat coefficient
+    arrays is where nearly all of the savings come from. This runs after
+    all modules have appended to Zone_Power_Injections/Withdrawals, so
+    the compiled rows are complete.
+    """
+    if instance.options.compile_linear_constraints:
+        from pyomo.repn.beta.matrix import compile_block_linear_constraints
+
+        compile_block_linear_constraints(
+            instance,
+            "Compiled_Linear_Constraints",
+            skip_trivial_constraints=True,
+            single_precision_storage=False,
+            verbose=instance.options.verbose,
+        )
+    elif instance.options.matrix_balance:
+        from pyomo.repn.beta.matrix import compile_block_linear_constraints
+
+        # Scope the compilation to the balance equations: the compiler
+        # consumes every active constraint it finds, so every other
+        # constraint is deactivated around the call and restored after.
+        others = [
+            c
+            for c in instance.component_objects(Constraint, active=True)
+            if c.name != "Zone_Energy_Balance"
+        ]
+        for c in others:
+            c.deactivate()
+        try:
+            compile_block_linear_constraints(
+                instance,
+                "Zone_Energy_Balance_Compiled",
+                skip_trivial_constraints=True,
+                single_precision_storage=False,
+                verbose=instance.options.verbose,
+            )
+        finally:
+            for c in others:
+                c.activate()
 
 
 def post_solve(instance, outdir):
@@ -153,24 +376,40 @@ def post_solve(instance, outdir):
     become a column.
 
     """
-    write_table(
-        instance,
-        instance.LOAD_ZONES,
-        instance.TIMEPOINTS,
-        output_file=os.path.join(outdir, "load_balance.csv"),
-        headings=(
-            "load_zone",
-            "timestamp",
-        )
-        + tuple(instance.Zone_Power_Injections + instance.Zone_Power_Withdrawals)
-        + ("ZoneTotalExcessGen",),
-        values=lambda m, z, t: (
-            z,
-            m.tp_timestamp[t],
-        )
-        + tuple(
-            getattr(m, component)[z, t]
-            for component in (m.Zone_Power_Injections + m.Zone_Power_Withdrawals)
-        )
-        + (m.ZoneTotalExcessGen[z, t],),
+    # Resolve the balance components once and stream rows straight to the
+    # csv writer instead of materializing the full table in memory first.
+    # The component objects were already resolved when Zone_Energy_Balance
+    # was constructed, so reuse that cache rather than re-running the
+    # getattr() lookups.
+    component_names = list(instance.Zone_Power_Injections) + list(
+        instance.Zone_Power_Withdrawals
     )
+    cache = _resolve_zone_balance_components(instance)
+    components = list(cache[0]) + list(cache[1])
+    excess = instance.ZoneTotalExcessGen
+    timestamp = instance.tp_timestamp
+    zones = tuple(instance.LOAD_ZONES)
+    timepoints = tuple(instance.TIMEPOINTS)
+    headings = ["load_zone", "timestamp"] + component_names + ["ZoneTotalExcessGen"]
+
+    def rows():
+        for z in zones:
+            for t in timepoints:
+                yield (z, timestamp[t]) + tuple(
+                    component[z, t] for component in components
+                ) + (excess[z, t],)
+
+    fmt = getattr(instance.options, "outputs_format", "csv")
+    if fmt == "csv":
+        with open(os.path.join(outdir, "load_balance.csv"), "w") as f:
+            w = csv.writer(f, dialect="match-csv")
+            w.writerow(headings)
+            w.writerows(format_row(row) for row in rows())
+    else:
+        # Compressed formats are written through pandas; these store the
+        # full-precision float values rather than the 6-significant-digit
+        # strings used in the plain csv.
+        df = pd.DataFrame(
+            [tuple(value(v) for v in row) for row in rows()], columns=headings
+        )
+        save_dataframe(df, outdir, "load_balance", fmt, index=False)
@@ -11,8 +11,11 @@ Defines financial parameters for the Match model.
 from __future__ import print_function
 from __future__ import division
 from pyomo.environ import *
+import concurrent.futures
 import os
+import numpy as np
 import pandas as pd
+from match_model.reporting import save_dataframe
 
 dependencies = "match_model.timescales"
 
@@ -28,6 +31,23 @@ def uniform_series_to_present_value(dr, t):
     return t if dr == 0 else (1 - (1 + dr) ** -t) / dr * (1 + dr)
 
 
+def uniform_series_to_present_value_vec(dr, t):
+    """
+    Vectorized form of uniform_series_to_present_value(): t may be a
+    numpy array (or anything numpy can coerce to one) of payment-series
+    lengths, and an array of conversion coefficients is returned. The
+    dr == 0 branch is resolved once up front rather than per element.
+    Example:
+    >>> [round(v, 7) for v in
+    ...     uniform_series_to_present_value_vec(.07, [10, 20])]
+    [7.5152322, 11.3355952]
+    """
+    t = np.asarray(t, dtype=np.float64)
+    if dr == 0:
+        return t
+    return (1.0 - (1.0 + dr) ** -t) / dr * (1.0 + dr)
+
+
 def future_to_present_value(dr, t):
     """
     Returns a coefficient to convert money from some future value to
@@ -55,6 +75,42 @@ def present_to_future_value(ir, t):
     return (1 + ir) ** t
 
 
+def _init_npv_conversion_factors(m):
+    """
+    Fill in bring_annual_costs_to_base_year and
+    bring_timepoint_costs_to_base_year for all periods and timepoints in
+    one vectorized pass. The annuity and discounting formulas are plain
+    arithmetic, so evaluating them on numpy arrays of period lengths and
+    timepoint weights avoids dispatching a Param initializer rule once
+    per index.
+    """
+    periods = list(m.PERIODS)
+    timepoints = list(m.TIMEPOINTS)
+    dr = value(m.discount_rate)
+    period_length = np.fromiter(
+        (value(m.period_length_years[p]) for p in periods),
+        dtype=np.float64,
+        count=len(periods),
+    )
+    annual = uniform_series_to_present_value_vec(
+        dr, period_length
+    ) * future_to_present_value(dr, value(m.dollar_year) - value(m.base_financial_year))
+    annual_by_period = dict(zip(periods, annual.tolist()))
+    m.bring_annual_costs_to_base_year.store_values(annual_by_period)
+    tp_factors = np.fromiter(
+        (annual_by_period[m.tp_period[t]] for t in timepoints),
+        dtype=np.float64,
+        count=len(timepoints),
+    ) * np.fromiter(
+        (value(m.tp_weight_in_year[t]) for t in timepoints),
+        dtype=np.float64,
+        count=len(timepoints),
+    )
+    m.bring_timepoint_costs_to_base_year.store_values(
+        dict(zip(timepoints, tp_factors.tolist()))
+    )
+
+
 def define_dynamic_lists(mod):
     """
     There are two lists of costs components that form the cost-minimization
@@ -182,6 +238,11 @@ def define_components(mod):
 
     """
 
+    # These stay immutable: they are consumed once, when the NPV
+    # conversion factors are computed and baked into the objective
+    # coefficients, so mutating them on a built instance would silently
+    # re-solve with a stale objective. In-place sweeps are only supported
+    # for zone_demand_mw, which remains symbolic in the constraints.
     mod.base_financial_year = Param(within=NonNegativeReals)
     mod.dollar_year = Param(within=NonNegativeReals)
     mod.discount_rate = Param(within=NonNegativeReals)
@@ -189,20 +250,66 @@ def define_components(mod):
     mod.bring_annual_costs_to_base_year = Param(
         mod.PERIODS,
         within=NonNegativeReals,
-        initialize=lambda m, p: (
-            uniform_series_to_present_value(m.discount_rate, m.period_length_years[p])
-            * future_to_present_value(
-                m.discount_rate, m.dollar_year - m.base_financial_year
-            )
-        ),
+        mutable=True,
+        default=0.0,
     )
     mod.bring_timepoint_costs_to_base_year = Param(
         mod.TIMEPOINTS,
         within=NonNegativeReals,
-        initialize=lambda m, t: (
-            m.bring_annual_costs_to_base_year[m.tp_period[t]] * m.tp_weight_in_year[t]
-        ),
+        mutable=True,
+        default=0.0,
     )
+    # Both conversion factors are pure closed-form arithmetic on data that
+    # is already loaded, so they are filled in bulk by a single BuildAction
+    # rather than invoking a Param initializer rule once per index.
+    mod.Calculate_NPV_Conversion_Factors = BuildAction(
+        rule=_init_npv_conversion_factors
+    )
+
+
+def _resolve_cost_components(m):
+    # Resolve the dynamic cost component lists into component objects
+    # once, on the first call, instead of repeating the getattr()
+    # lookups for every timepoint and period. The timepoint membership
+    # of each period is materialized as flat tuples at the same time,
+    # since iterating an IndexedSet element repeatedly is much slower
+    # than iterating a tuple.
+    cache = getattr(m, "_cost_components", None)
+    if cache is None:
+        cache = (
+            [getattr(m, tp_cost) for tp_cost in m.Cost_Components_Per_TP],
+            [getattr(m, annual_cost) for annual_cost in m.Cost_Components_Per_Period],
+            {p: tuple(m.TPS_IN_PERIOD[p]) for p in m.PERIODS},
+        )
+        m._cost_components = cache
+    return cache
+
+
+# Note: multiply annual costs by a conversion factor if running this
+# model on an intentional subset of annual data whose weights do not
+# add up to a full year: sum(tp_weight_in_year) / hours_per_year
+# This would also require disabling the validate_time_weights check.
+def _init_sys_costs_per_period(m, p):
+    tp_costs, annual_costs, tps_in_period = _resolve_cost_components(m)
+    # Fold the annual-to-base-year conversion factor into the term
+    # weights, so each period's cost is one flat weighted sum instead
+    # of a product distributed over a large sum expression. The factor
+    # is fixed once the financial inputs are loaded, so it is safe to
+    # evaluate it eagerly here.
+    bring = value(m.bring_annual_costs_to_base_year[p])
+    return quicksum(annual_cost[p] * bring for annual_cost in annual_costs) + quicksum(
+        tp_cost[t] * (m.tp_weight_in_year[t] * bring)
+        for t in tps_in_period[p]
+        for tp_cost in tp_costs
+    )
+
+
+def _init_system_cost(m):
+    return quicksum(m.SystemCostPerPeriod[p] for p in m.PERIODS)
+
+
+def _init_objective(m):
+    return m.SystemCost
 
 
 def define_dynamic_components(mod):
@@ -232,41 +339,12 @@ def define_dynamic_components(mod):
 
     """
 
-    def calc_tp_costs_in_period(m, t):
-        return sum(
-            getattr(m, tp_cost)[t] * m.tp_weight_in_year[t]
-            for tp_cost in m.Cost_Components_Per_TP
-        )
-
-    # Note: multiply annual costs by a conversion factor if running this
-    # model on an intentional subset of annual data whose weights do not
-    # add up to a full year: sum(tp_weight_in_year) / hours_per_year
-    # This would also require disabling the validate_time_weights check.
-    def calc_annual_costs_in_period(m, p):
-        return sum(
-            getattr(m, annual_cost)[p] for annual_cost in m.Cost_Components_Per_Period
-        )
-
-    def calc_sys_costs_per_period(m, p):
-        return (
-            # All annual payments in the period
-            (
-                calc_annual_costs_in_period(m, p)
-                + sum(calc_tp_costs_in_period(m, t) for t in m.TPS_IN_PERIOD[p])
-            )
-            *
-            # Conversion from annual costs to base year
-            m.bring_annual_costs_to_base_year[p]
-        )
-
-    mod.SystemCostPerPeriod = Expression(mod.PERIODS, rule=calc_sys_costs_per_period)
+    mod.SystemCostPerPeriod = Expression(mod.PERIODS, rule=_init_sys_costs_per_period)
     # starting with Pyomo 4.2, it is impossible to call Objective.reconstruct()
     # or calculate terms like Objective / <some other model component>,
     # so it's best to define a separate expression and use that for these purposes.
-    mod.SystemCost = Expression(
-        rule=lambda m: sum(m.SystemCostPerPeriod[p] for p in m.PERIODS)
-    )
-    mod.Minimize_System_Cost = Objective(rule=lambda m: m.SystemCost, sense=minimize)
+    mod.SystemCost = Expression(rule=_init_system_cost)
+    mod.Minimize_System_Cost = Objective(rule=_init_objective, sense=minimize)
 
 
 def load_inputs(mod, match_data, inputs_dir):
@@ -285,65 +363,124 @@ def load_inputs(mod, match_data, inputs_dir):
     )
 
 
+def _write_cost_table(columns, index, output_dir, basename, fmt):
+    """
+    Build a DataFrame from plain columns and write it. Module-level (and
+    fed only picklable data) so it can run in a worker process under
+    --parallel-post-solve.
+    """
+    df = pd.DataFrame(columns)
+    df.set_index(index, inplace=True)
+    save_dataframe(df, output_dir, basename, fmt)
+
+
 def post_solve(instance, outdir):
     m = instance
-    # Overall electricity costs
-    normalized_dat = [
-        {
-            "PERIOD": p,
-            "SystemCostPerPeriod_NPV": value(m.SystemCostPerPeriod[p]),
-            "SystemCostPerPeriod_Real": value(
-                m.SystemCostPerPeriod[p] / m.bring_annual_costs_to_base_year[p]
-            ),
-            "EnergyCostReal_per_MWh": value(
-                m.SystemCostPerPeriod[p]
-                / m.bring_annual_costs_to_base_year[p]
-                / sum(m.zone_total_demand_in_period_mwh[z, p] for z in m.LOAD_ZONES)
-            ),
-            "SystemDemand_MWh": value(
-                sum(m.zone_total_demand_in_period_mwh[z, p] for z in m.LOAD_ZONES)
-            ),
-        }
-        for p in m.PERIODS
-    ]
-    df = pd.DataFrame(normalized_dat)
-    df.set_index(["PERIOD"], inplace=True)
-    df.to_csv(os.path.join(outdir, "electricity_cost.csv"))
-    # Itemized annual costs
-    annualized_costs = [
-        {
-            "PERIOD": p,
-            "Component": annual_cost,
-            "Component_type": "annual",
-            "AnnualCost_NPV": value(
-                getattr(m, annual_cost)[p] * m.bring_annual_costs_to_base_year[p]
-            ),
-            "AnnualCost_Real": value(getattr(m, annual_cost)[p]),
-        }
-        for p in m.PERIODS
-        for annual_cost in m.Cost_Components_Per_Period
-    ] + [
-        {
-            "PERIOD": p,
-            "Component": tp_cost,
-            "Component_type": "timepoint",
-            "AnnualCost_NPV": value(
-                sum(
-                    getattr(m, tp_cost)[t] * m.tp_weight_in_year[t]
-                    for t in m.TPS_IN_PERIOD[p]
-                )
-                * m.bring_annual_costs_to_base_year[p]
-            ),
-            "AnnualCost_Real": value(
-                sum(
+    fmt = getattr(m.options, "outputs_format", "csv")
+    periods = list(m.PERIODS)
+    zones = list(m.LOAD_ZONES)
+    tps_in_period = {p: tuple(m.TPS_IN_PERIOD[p]) for p in periods}
+    # Overall electricity costs: evaluate each quantity once per period
+    # into numpy arrays and build the table columnar, instead of one dict
+    # per row with repeated expression walks.
+    npv = np.fromiter(
+        (value(m.SystemCostPerPeriod[p]) for p in periods),
+        dtype=np.float64,
+        count=len(periods),
+    )
+    bring = np.fromiter(
+        (value(m.bring_annual_costs_to_base_year[p]) for p in periods),
+        dtype=np.float64,
+        count=len(periods),
+    )
+    demand = np.fromiter(
+        (
+            sum(value(m.zone_total_demand_in_period_mwh[z, p]) for z in zones)
+            for p in periods
+        ),
+        dtype=np.float64,
+        count=len(periods),
+    )
+    real = npv / bring
+    electricity_cost_columns = {
+        "PERIOD": periods,
+        "SystemCostPerPeriod_NPV": npv,
+        "SystemCostPerPeriod_Real": real,
+        "EnergyCostReal_per_MWh": real / demand,
+        "SystemDemand_MWh": demand,
+    }
+    # Itemized annual costs, collected into flat columns. The numeric
+    # columns are preallocated float64 arrays, so each value is stored
+    # unboxed instead of as a Python float in a growing list.
+    annual_components = list(m.Cost_Components_Per_Period)
+    tp_components = list(m.Cost_Components_Per_TP)
+    n_rows = len(periods) * (len(annual_components) + len(tp_components))
+    cost_periods = []
+    cost_components = []
+    cost_types = []
+    cost_npv = np.empty(n_rows, dtype=np.float64)
+    cost_real = np.empty(n_rows, dtype=np.float64)
+    # Rows keep the historical order: all annual components for all
+    # periods first, then all timepoint components. Each cost expression
+    # is evaluated once; the NPV column is the real value scaled by the
+    # (already evaluated) conversion factor, rather than a second walk of
+    # the expression tree.
+    i = 0
+    for pi, p in enumerate(periods):
+        bring_p = bring[pi]
+        for annual_cost in annual_components:
+            cost_periods.append(p)
+            cost_components.append(annual_cost)
+            cost_types.append("annual")
+            real_cost = value(getattr(m, annual_cost)[p])
+            cost_npv[i] = real_cost * bring_p
+            cost_real[i] = real_cost
+            i += 1
+    for pi, p in enumerate(periods):
+        bring_p = bring[pi]
+        for tp_cost in tp_components:
+            cost_periods.append(p)
+            cost_components.append(tp_cost)
+            cost_types.append("timepoint")
+            real_cost = value(
+                quicksum(
                     getattr(m, tp_cost)[t] * m.tp_weight_in_year[t]
-                    for t in m.TPS_IN_PERIOD[p]
+                    for t in tps_in_period[p]
                 )
-            ),
-        }
-        for p in m.PERIODS
-        for tp_cost in m.Cost_Components_Per_TP
+            )
+            cost_npv[i] = real_cost * bring_p
+            cost_real[i] = real_cost
+            i += 1
+    costs_itemized_columns = {
+        "PERIOD": cost_periods,
+        "Component": cost_components,
+        "Component_type": cost_types,
+        "AnnualCost_NPV": cost_npv,
+        "AnnualCost_Real": cost_real,
+    }
+    # The model values above were all evaluated in this process; the
+    # remaining work (DataFrame construction and file encoding) only
+    # needs the plain columns, so the two independent tables can be
+    # written from worker processes when requested.
+    write_jobs = [
+        (_write_cost_table, electricity_cost_columns, ["PERIOD"], "electricity_cost"),
+        (
+            _write_cost_table,
+            costs_itemized_columns,
+            ["PERIOD", "Component"],
+            "costs_itemized",
+        ),
     ]
-    df = pd.DataFrame(annualized_costs)
-    df.set_index(["PERIOD", "Component"], inplace=True)
-    df.to_csv(os.path.join(outdir, "costs_itemized.csv"))
+    if getattr(m.options, "parallel_post_solve", False):
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=len(write_jobs)
+        ) as pool:
+            futures = [
+                pool.submit(job, columns, index, outdir, basename, fmt)
+                for (job, columns, index, basename) in write_jobs
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for (job, columns, index, basename) in write_jobs:
+            job(columns, index, outdir, basename, fmt)
@@ -56,6 +56,25 @@ def define_arguments(argparser):
         dest="sorted_output",
         help="Write generic variable result values in sorted order",
     )
+    argparser.add_argument(
+        "--outputs-format",
+        dest="outputs_format",
+        choices=["csv", "csv.gz", "parquet"],
+        default="csv",
+        help="File format for the large tabular outputs (load_balance, "
+        "electricity_cost, costs_itemized). 'csv.gz' and 'parquet' produce "
+        "much smaller files for large scenario sweeps; 'parquet' requires "
+        "the pyarrow package.",
+    )
+    argparser.add_argument(
+        "--parallel-post-solve",
+        default=False,
+        action="store_true",
+        dest="parallel_post_solve",
+        help="Write independent output tables from worker processes where "
+        "possible. Model values are still evaluated in the main process; "
+        "only the DataFrame construction and file encoding are fanned out.",
+    )
     argparser.add_argument(
         "--save-expressions",
         "--save-expression",
@@ -67,6 +86,46 @@ def define_arguments(argparser):
     )
 
 
+def save_dataframe(df, output_dir, basename, fmt="csv", index=True):
+    """
+    Write a DataFrame to output_dir in the format selected with
+    --outputs-format. The file extension is derived from the format, so
+    callers pass only the base name (e.g. "costs_itemized").
+    """
+    if fmt == "parquet":
+        df.to_parquet(
+            os.path.join(output_dir, basename + ".parquet"),
+            engine="pyarrow",
+            compression="snappy",
+            index=index,
+        )
+    elif fmt == "csv.gz":
+        df.to_csv(
+            os.path.join(output_dir, basename + ".csv.gz"),
+            compression="gzip",
+            index=index,
+        )
+    else:
+        df.to_csv(os.path.join(output_dir, basename + ".csv"), index=index)
+
+
+def format_row(row, digits=6):
+    """
+    Evaluate each element of row and format floats with the requested
+    number of significant digits, zeroing out values below the solver
+    noise threshold. Returns the formatted row as a tuple.
+    """
+    row = [value(v) for v in row]
+    sig_digits = "{0:." + str(digits) + "g}"
+    for (i, v) in enumerate(row):
+        if isinstance(v, float):
+            if abs(v) < 1e-10:
+                row[i] = 0
+            else:
+                row[i] = sig_digits.format(v)
+    return tuple(row)
+
+
 def write_table(instance, *indexes, **kwargs):
     # there must be a way to accept specific named keyword arguments and
     # also an open-ended list of positional arguments (*indexes), but I
@@ -81,20 +140,9 @@ def write_table(instance, *indexes, **kwargs):
         # write header row
         w.writerow(list(headings))
         # write the data
-        def format_row(row):
-            row = [value(v) for v in row]
-            sig_digits = "{0:." + str(digits) + "g}"
-            for (i, v) in enumerate(row):
-                if isinstance(v, float):
-                    if abs(v) < 1e-10:
-                        row[i] = 0
-                    else:
-                        row[i] = sig_digits.format(v)
-            return tuple(row)
-
         try:
             w.writerows(
-                format_row(row=values(instance, *unpack_elements(x)))
+                format_row(row=values(instance, *unpack_elements(x)), digits=digits)
                 for x in itertools.product(*indexes)
             )
         except TypeError:  # lambda got wrong number of arguments
@@ -102,7 +150,7 @@ def write_table(instance, *indexes, **kwargs):
             w.writerows(
                 # TODO: flatten x (unpack tuples) like Pyomo before calling values()
                 # That may cause problems elsewhere though...
-                format_row(row=values(instance, *x))
+                format_row(row=values(instance, *x), digits=digits)
                 for x in itertools.product(*indexes)
             )
             print(
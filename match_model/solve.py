@@ -849,8 +849,11 @@ def solve(model):
         # note: Pyomo added an options_string argument to solver.solve() in Pyomo 4.2 rev 10587.
         # (See https://software.sandia.gov/trac/pyomo/browser/pyomo/trunk/pyomo/opt/base/solvers.py?rev=10587 )
         # This is misreported in the documentation as options=, but options= actually accepts a dictionary.
-        if model.options.solver_options_string and not hasattr(
-            model.solver, "_options_string_to_dict"
+        # Persistent solvers don't accept an options_string argument at
+        # solve time, so their options are also loaded here.
+        if model.options.solver_options_string and (
+            hasattr(model.solver, "set_instance")
+            or not hasattr(model.solver, "_options_string_to_dict")
         ):
             for k, v in _options_string_to_dict(
                 model.options.solver_options_string
@@ -899,7 +902,22 @@ def solve(model):
 
         TempfileManager.tempdir = model.options.tempdir
 
-    results = model.solver_manager.solve(model, opt=model.solver, **solver_args)
+    if hasattr(model.solver, "set_instance"):
+        # Persistent solver interface (e.g. --solver gurobi_persistent):
+        # load the instance into the solver once, then re-solve in place on
+        # later calls. This skips the LP/NL rewrite entirely on repeated
+        # solves, e.g. scenario sweeps that mutate Param values (demand,
+        # discount rate, ...) on the built instance. After changing a
+        # mutable Param, callers must push the affected constraints and
+        # objective to the solver via model.solver.remove_constraint() /
+        # add_constraint() (or set_objective) before re-solving.
+        if not getattr(model, "solver_instance_loaded", False):
+            model.solver.set_instance(model)
+            model.solver_instance_loaded = True
+        persistent_args = {k: solver_args[k] for k in ("tee",) if k in solver_args}
+        results = model.solver.solve(**persistent_args)
+    else:
+        results = model.solver_manager.solve(model, opt=model.solver, **solver_args)
     # import pdb; pdb.set_trace()
 
     if model.options.verbose:
@@ -70,19 +70,21 @@ setup(
     install_requires=[
         "Pyomo",  # We need a version that works with glpk 4.60+
         "pandas",  # used for input upgrades and testing that functionality
+        "numpy",  # used for vectorized parameter initialization
         "pyutilib",
     ],
     extras_require={
         # packages used for advanced demand response, progressive hedging
         # note: rpy2 discontinued support for Python 2 as of rpy2 2.9.0
         "advanced": [
-            "numpy",
             "scipy",
             'rpy2<2.9.0;python_version<"3.0"',
             'rpy2;python_version>="3.0"',
             "sympy",
         ],
         "dev": ["ipdb"],
+        # needed for "--outputs-format parquet"
+        "parquet": ["pyarrow"],
         "plotting": ["ggplot"],
         "database_access": ["psycopg2-binary"],
     },